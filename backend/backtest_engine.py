@@ -5,6 +5,8 @@ from typing import Dict, List, Optional
 import yfinance as yf
 import ccxt
 import time
+from execution_model import ExecutionModel
+from metrics import compute_metrics
 
 class BacktestEngine:
     def __init__(self, symbol: str, start_date: str, end_date: str, 
@@ -76,11 +78,7 @@ class BacktestEngine:
     def run_backtest(self, strategy: Dict) -> Dict:
         df = self.data.copy()
         capital = self.initial_capital
-        position = 0
-        entry_price = 0
-        entry_index = 0
         trades = []
-        equity_curve = [capital]
         sma_short = strategy.get("sma_short", 20)
         sma_long = strategy.get("sma_long", 50)
         rsi_period = strategy.get("rsi_period", 14)
@@ -88,85 +86,74 @@ class BacktestEngine:
         rsi_overbought = strategy.get("rsi_overbought", 70)
         stop_loss_pct = strategy.get("stop_loss", 0.02)
         take_profit_pct = strategy.get("take_profit", 0.04)
+        execution = ExecutionModel.from_strategy(strategy)
         df['sma_short'] = df['close'].rolling(sma_short).mean()
         df['sma_long'] = df['close'].rolling(sma_long).mean()
         df['rsi'] = self._calculate_rsi(df['close'], rsi_period)
-        for i in range(max(sma_long, rsi_period), len(df)):
-            current_price = df['close'].iloc[i]
-            sma_cross_up = (df['sma_short'].iloc[i] > df['sma_long'].iloc[i] and 
-                           df['sma_short'].iloc[i-1] <= df['sma_long'].iloc[i-1])
-            sma_cross_down = (df['sma_short'].iloc[i] < df['sma_long'].iloc[i] and 
-                             df['sma_short'].iloc[i-1] >= df['sma_long'].iloc[i-1])
-            rsi_oversold_signal = df['rsi'].iloc[i] < rsi_oversold
-            rsi_overbought_signal = df['rsi'].iloc[i] > rsi_overbought
-            if position != 0:
-                pnl_pct = (current_price - entry_price) / entry_price if position == 1 else (entry_price - current_price) / entry_price
-                if (position == 1 and (pnl_pct <= -stop_loss_pct or pnl_pct >= take_profit_pct)) or \
-                   (position == -1 and (pnl_pct <= -stop_loss_pct or pnl_pct >= take_profit_pct)):
-                    pnl = capital * pnl_pct
-                    capital += pnl
-                    entry_date = df.index[entry_index]
-                    exit_date = df.index[i]
-                    trades.append({
-                        'entry_date': entry_date.strftime('%Y-%m-%d') if hasattr(entry_date, 'strftime') else str(entry_date),
-                        'exit_date': exit_date.strftime('%Y-%m-%d') if hasattr(exit_date, 'strftime') else str(exit_date),
-                        'entry_price': entry_price,
-                        'exit_price': current_price,
-                        'position': 'long' if position == 1 else 'short',
-                        'pnl': pnl,
-                        'pnl_pct': pnl_pct * 100
-                    })
-                    position = 0
-                    entry_price = 0
-                    entry_index = 0
-            if position == 0:
-                if sma_cross_up or rsi_oversold_signal:
-                    position = 1
-                    entry_price = current_price
-                    entry_index = i
-                elif sma_cross_down or rsi_overbought_signal:
-                    position = -1
-                    entry_price = current_price
-                    entry_index = i
-            equity_curve.append(capital)
-        if position != 0:
-            final_price = df['close'].iloc[-1]
-            pnl_pct = (final_price - entry_price) / entry_price if position == 1 else (entry_price - final_price) / entry_price
-            pnl = capital * pnl_pct
+        start = max(sma_long, rsi_period)
+        # Signaux calculés en une passe vectorisée sur toute la série
+        above = df['sma_short'] > df['sma_long']
+        below = df['sma_short'] < df['sma_long']
+        prev_above_eq = (df['sma_short'] >= df['sma_long']).shift(1, fill_value=False)
+        prev_below_eq = (df['sma_short'] <= df['sma_long']).shift(1, fill_value=False)
+        long_signal = ((above & prev_below_eq) | (df['rsi'] < rsi_oversold)).to_numpy(dtype=bool, copy=True)
+        short_signal = ((below & prev_above_eq) | (df['rsi'] > rsi_overbought)).to_numpy(dtype=bool) & ~long_signal
+        long_signal[:start] = False
+        short_signal[:start] = False
+        entry_candidates = np.flatnonzero(long_signal | short_signal)
+        open_ = df['open'].to_numpy(dtype=float)
+        high = df['high'].to_numpy(dtype=float)
+        low = df['low'].to_numpy(dtype=float)
+        close = df['close'].to_numpy(dtype=float)
+        pnl_by_bar = np.zeros(len(df))
+        search_from = start
+        while True:
+            k = np.searchsorted(entry_candidates, search_from)
+            if k >= len(entry_candidates):
+                break
+            entry_index = int(entry_candidates[k])
+            side = 1 if long_signal[entry_index] else -1
+            entry_price = close[entry_index]
+            stop_price = entry_price * (1 - side * stop_loss_pct)
+            target_price = entry_price * (1 + side * take_profit_pct)
+            notional = execution.notional(capital, stop_loss_pct)
+            hit = execution.first_hit(open_, high, low, entry_index + 1, side, stop_price, target_price)
+            if hit is None:
+                exit_index, exit_price, exit_reason = len(df) - 1, close[-1], "end_of_data"
+            else:
+                exit_index, exit_price, exit_reason = hit
+            pnl, fees = execution.trade_pnl(notional, side, entry_price, exit_price)
             capital += pnl
-            entry_date = df.index[entry_index]
-            exit_date = df.index[-1]
-            trades.append({
-                'entry_date': entry_date.strftime('%Y-%m-%d') if hasattr(entry_date, 'strftime') else str(entry_date),
-                'exit_date': exit_date.strftime('%Y-%m-%d') if hasattr(exit_date, 'strftime') else str(exit_date),
-                'entry_price': entry_price,
-                'exit_price': final_price,
-                'position': 'long' if position == 1 else 'short',
-                'pnl': pnl,
-                'pnl_pct': pnl_pct * 100
-            })
-        total_return = (capital - self.initial_capital) / self.initial_capital * 100
-        winning_trades = [t for t in trades if t['pnl'] > 0]
-        losing_trades = [t for t in trades if t['pnl'] < 0]
-        win_rate = len(winning_trades) / len(trades) * 100 if trades else 0
-        total_profit = sum(t['pnl'] for t in winning_trades) if winning_trades else 0
-        total_loss = abs(sum(t['pnl'] for t in losing_trades)) if losing_trades else 1
-        profit_factor = total_profit / total_loss if total_loss > 0 else 0
-        returns = np.diff(equity_curve) / equity_curve[:-1]
-        sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(252) if np.std(returns) > 0 else 0
-        peak = np.maximum.accumulate(equity_curve)
-        drawdown = (equity_curve - peak) / peak
-        max_drawdown = abs(np.min(drawdown)) * 100
+            trades.append(self._make_trade(df, entry_index, exit_index, side,
+                                           execution.fill_price(entry_price, side, True),
+                                           execution.fill_price(exit_price, side, False),
+                                           pnl, pnl / notional if notional else 0.0, fees, exit_reason))
+            pnl_by_bar[exit_index] += pnl
+            if hit is None:
+                break
+            # Une nouvelle entrée reste possible à la clôture de la barre de sortie
+            search_from = exit_index
+        equity_curve = np.concatenate(([self.initial_capital],
+                                       self.initial_capital + np.cumsum(pnl_by_bar[start:])))
+        return compute_metrics(equity_curve, trades, self.initial_capital,
+                               self.timeframe, self.market_type)
+    
+    def _make_trade(self, df: pd.DataFrame, entry_index: int, exit_index: int, side: int,
+                    entry_price: float, exit_price: float, pnl: float, pnl_pct: float,
+                    fees: float, exit_reason: str) -> Dict:
+        entry_date = df.index[entry_index]
+        exit_date = df.index[exit_index]
         return {
-            "total_return": round(total_return, 2),
-            "sharpe_ratio": round(sharpe_ratio, 2),
-            "max_drawdown": round(max_drawdown, 2),
-            "win_rate": round(win_rate, 2),
-            "total_trades": len(trades),
-            "profit_factor": round(profit_factor, 2),
-            "equity_curve": [round(x, 2) for x in equity_curve],
-            "trades": trades,
-            "final_capital": round(capital, 2)
+            'entry_date': entry_date.strftime('%Y-%m-%d') if hasattr(entry_date, 'strftime') else str(entry_date),
+            'exit_date': exit_date.strftime('%Y-%m-%d') if hasattr(exit_date, 'strftime') else str(exit_date),
+            'entry_price': float(entry_price),
+            'exit_price': float(exit_price),
+            'position': 'long' if side == 1 else 'short',
+            'pnl': float(pnl),
+            'pnl_pct': float(pnl_pct) * 100,
+            'fees': float(fees),
+            'exit_reason': exit_reason,
+            'duration_bars': exit_index - entry_index
         }
     
     def run_backtest_from_code(self, robot_code: str) -> Dict:
@@ -175,7 +162,10 @@ class BacktestEngine:
             'np': np,
             'data': self.data.copy(),
             'initial_capital': self.initial_capital,
-            'symbol': self.symbol
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'market_type': self.market_type,
+            'compute_metrics': compute_metrics
         }
         try:
             exec(robot_code, namespace)
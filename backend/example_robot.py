@@ -6,8 +6,10 @@ Le robot doit utiliser les variables suivantes disponibles:
 - data: DataFrame pandas avec les colonnes (open, high, low, close, volume)
 - initial_capital: Capital initial
 - symbol: Symbole tradé
+- timeframe, market_type: Timeframe et type de marché du backtest
+- compute_metrics: Calcule le dictionnaire 'results' à partir de la courbe de capital et des trades
 
-Le robot doit définir une variable 'results' avec le format suivant:
+Le robot doit définir une variable 'results' avec au minimum le format suivant:
 {
     "total_return": float,
     "sharpe_ratio": float,
@@ -38,6 +40,7 @@ df = data.copy()
 capital = initial_capital
 position = 0  # 0 = pas de position, 1 = long
 entry_price = 0
+entry_index = 0
 trades = []
 equity_curve = [capital]
 
@@ -59,13 +62,14 @@ for i in range(20, len(df)):
             pnl = capital * pnl_pct
             capital += pnl
             trades.append({
-                'entry_date': str(df.index[entry_price]),
+                'entry_date': str(df.index[entry_index]),
                 'exit_date': str(df.index[i]),
                 'entry_price': entry_price,
                 'exit_price': current_price,
                 'position': 'long',
                 'pnl': pnl,
-                'pnl_pct': pnl_pct * 100
+                'pnl_pct': pnl_pct * 100,
+                'duration_bars': i - entry_index
             })
             position = 0
             entry_price = 0
@@ -76,6 +80,7 @@ for i in range(20, len(df)):
         if rsi < 30 and current_price > sma:
             position = 1
             entry_price = current_price
+            entry_index = i
     
     equity_curve.append(capital)
 
@@ -86,43 +91,16 @@ if position == 1:
     pnl = capital * pnl_pct
     capital += pnl
     trades.append({
-        'entry_date': str(df.index[entry_price]),
+        'entry_date': str(df.index[entry_index]),
         'exit_date': str(df.index[-1]),
         'entry_price': entry_price,
         'exit_price': final_price,
         'position': 'long',
         'pnl': pnl,
-        'pnl_pct': pnl_pct * 100
+        'pnl_pct': pnl_pct * 100,
+        'duration_bars': len(df) - 1 - entry_index
     })
+    equity_curve[-1] = capital
 
-# Calcul des métriques
-total_return = (capital - initial_capital) / initial_capital * 100
-winning_trades = [t for t in trades if t['pnl'] > 0]
-losing_trades = [t for t in trades if t['pnl'] < 0]
-win_rate = len(winning_trades) / len(trades) * 100 if trades else 0
-
-total_profit = sum(t['pnl'] for t in winning_trades) if winning_trades else 0
-total_loss = abs(sum(t['pnl'] for t in losing_trades)) if losing_trades else 1
-profit_factor = total_profit / total_loss if total_loss > 0 else 0
-
-# Sharpe ratio
-returns = np.diff(equity_curve) / equity_curve[:-1]
-sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(252) if np.std(returns) > 0 else 0
-
-# Max drawdown
-peak = np.maximum.accumulate(equity_curve)
-drawdown = (equity_curve - peak) / peak
-max_drawdown = abs(np.min(drawdown)) * 100
-
-# Résultats
-results = {
-    "total_return": round(total_return, 2),
-    "sharpe_ratio": round(sharpe_ratio, 2),
-    "max_drawdown": round(max_drawdown, 2),
-    "win_rate": round(win_rate, 2),
-    "total_trades": len(trades),
-    "profit_factor": round(profit_factor, 2),
-    "equity_curve": [round(x, 2) for x in equity_curve],
-    "trades": trades,
-    "final_capital": round(capital, 2)
-}
+# Calcul des métriques (mêmes statistiques que le moteur de backtest)
+results = compute_metrics(equity_curve, trades, initial_capital, timeframe, market_type)
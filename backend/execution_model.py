@@ -0,0 +1,103 @@
+﻿import numpy as np
+from typing import Dict, Optional, Tuple
+
+INTRABAR_POLICIES = ("stop_first", "target_first", "nearest_open")
+
+class ExecutionModel:
+    """Modèle d'exécution: stop/target intrabar, frais, spread, slippage et taille de position"""
+
+    def __init__(self, fee_pct: float = 0.001, fee_fixed: float = 0.0,
+                 spread_pct: float = 0.0, slippage_pct: float = 0.0005,
+                 position_size: float = 1.0, risk_per_trade: float = 0.0,
+                 intrabar_policy: str = "stop_first", search_window: int = 256):
+        if intrabar_policy not in INTRABAR_POLICIES:
+            raise ValueError(f"Politique intrabar inconnue: {intrabar_policy} "
+                             f"(valeurs possibles: {', '.join(INTRABAR_POLICIES)})")
+        self.fee_pct = fee_pct
+        self.fee_fixed = fee_fixed
+        self.spread_pct = spread_pct
+        self.slippage_pct = slippage_pct
+        self.position_size = position_size
+        self.risk_per_trade = risk_per_trade
+        self.intrabar_policy = intrabar_policy
+        self.search_window = max(int(search_window), 1)
+
+    @classmethod
+    def from_strategy(cls, strategy: Dict) -> "ExecutionModel":
+        return cls(
+            fee_pct=strategy.get("fee_pct", 0.001),
+            fee_fixed=strategy.get("fee_fixed", 0.0),
+            spread_pct=strategy.get("spread_pct", 0.0),
+            slippage_pct=strategy.get("slippage_pct", 0.0005),
+            position_size=strategy.get("position_size", 1.0),
+            risk_per_trade=strategy.get("risk_per_trade", 0.0),
+            intrabar_policy=strategy.get("intrabar_policy", "stop_first")
+        )
+
+    def fill_price(self, price: float, side: int, is_entry: bool) -> float:
+        """Prix exécuté après demi-spread et slippage, toujours en défaveur du trader"""
+        cost = self.spread_pct / 2 + self.slippage_pct
+        direction = side if is_entry else -side
+        return price * (1 + direction * cost)
+
+    def notional(self, capital: float, stop_loss_pct: float) -> float:
+        """Montant engagé: fraction du capital, ou taille calculée sur le risque au stop"""
+        fraction = self.position_size
+        if self.risk_per_trade > 0 and stop_loss_pct > 0:
+            fraction = min(self.risk_per_trade / stop_loss_pct, self.position_size)
+        return capital * fraction
+
+    def first_hit(self, open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                  start: int, side: int, stop_price: float,
+                  target_price: float) -> Optional[Tuple[int, float, str]]:
+        """Recherche vectorisée de la première barre >= start touchant le stop ou l'objectif.
+
+        La recherche se fait par fenêtres de taille croissante pour rester proportionnelle
+        à la durée du trade. Retourne (index, prix de sortie brut, raison) ou None.
+        """
+        n = len(high)
+        window = self.search_window
+        pos = start
+        while pos < n:
+            end = min(pos + window, n)
+            if side == 1:
+                stop_hit = low[pos:end] <= stop_price
+                target_hit = high[pos:end] >= target_price
+            else:
+                stop_hit = high[pos:end] >= stop_price
+                target_hit = low[pos:end] <= target_price
+            any_hit = stop_hit | target_hit
+            if any_hit.any():
+                k = int(np.argmax(any_hit))
+                i = pos + k
+                return self._resolve_bar(open_[i], side, stop_price, target_price,
+                                         bool(stop_hit[k]), bool(target_hit[k]), i)
+            pos = end
+            window *= 2
+        return None
+
+    def _resolve_bar(self, bar_open: float, side: int, stop_price: float, target_price: float,
+                     stop_hit: bool, target_hit: bool, i: int) -> Tuple[int, float, str]:
+        # Gap d'ouverture au-delà d'un niveau: exécution à l'ouverture
+        if side * (bar_open - stop_price) <= 0:
+            return i, bar_open, "stop_loss"
+        if side * (bar_open - target_price) >= 0:
+            return i, bar_open, "take_profit"
+        if stop_hit and target_hit:
+            if self.intrabar_policy == "target_first":
+                stop_hit = False
+            elif self.intrabar_policy == "nearest_open":
+                stop_hit = abs(bar_open - stop_price) <= abs(target_price - bar_open)
+        if stop_hit:
+            return i, stop_price, "stop_loss"
+        return i, target_price, "take_profit"
+
+    def trade_pnl(self, notional: float, side: int, entry_price: float,
+                  exit_price: float) -> Tuple[float, float]:
+        """Retourne (pnl net, frais) pour un aller-retour sur le montant engagé"""
+        entry_fill = self.fill_price(entry_price, side, True)
+        exit_fill = self.fill_price(exit_price, side, False)
+        quantity = notional / entry_fill
+        gross = quantity * (exit_fill - entry_fill) * side
+        fees = self.fee_pct * quantity * (entry_fill + exit_fill) + 2 * self.fee_fixed
+        return gross - fees, fees
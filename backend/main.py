@@ -78,6 +78,15 @@ class BacktestResult(BaseModel):
     equity_curve: List[float]
     trades: List[dict]
     optimization_suggestions: List[dict]
+    sortino_ratio: float = 0.0
+    calmar_ratio: float = 0.0
+    cagr: float = 0.0
+    max_drawdown_duration: int = 0
+    exposure: float = 0.0
+    avg_trade_duration: float = 0.0
+    median_trade_duration: float = 0.0
+    max_trade_duration: float = 0.0
+    rolling_sharpe: List[float] = []
 
 @app.get("/")
 async def root():
@@ -136,7 +145,16 @@ async def run_backtest(request: BacktestRequest):
             profit_factor=results["profit_factor"],
             equity_curve=results["equity_curve"],
             trades=results["trades"],
-            optimization_suggestions=suggestions
+            optimization_suggestions=suggestions,
+            sortino_ratio=results.get("sortino_ratio", 0.0),
+            calmar_ratio=results.get("calmar_ratio", 0.0),
+            cagr=results.get("cagr", 0.0),
+            max_drawdown_duration=results.get("max_drawdown_duration", 0),
+            exposure=results.get("exposure", 0.0),
+            avg_trade_duration=results.get("avg_trade_duration", 0.0),
+            median_trade_duration=results.get("median_trade_duration", 0.0),
+            max_trade_duration=results.get("max_trade_duration", 0.0),
+            rolling_sharpe=results.get("rolling_sharpe", [])
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -180,7 +198,16 @@ async def upload_robot(file: UploadFile = File(...), symbol: str = None,
             profit_factor=results["profit_factor"],
             equity_curve=results["equity_curve"],
             trades=results["trades"],
-            optimization_suggestions=suggestions
+            optimization_suggestions=suggestions,
+            sortino_ratio=results.get("sortino_ratio", 0.0),
+            calmar_ratio=results.get("calmar_ratio", 0.0),
+            cagr=results.get("cagr", 0.0),
+            max_drawdown_duration=results.get("max_drawdown_duration", 0),
+            exposure=results.get("exposure", 0.0),
+            avg_trade_duration=results.get("avg_trade_duration", 0.0),
+            median_trade_duration=results.get("median_trade_duration", 0.0),
+            max_trade_duration=results.get("max_trade_duration", 0.0),
+            rolling_sharpe=results.get("rolling_sharpe", [])
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
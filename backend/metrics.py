@@ -0,0 +1,119 @@
+﻿import re
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+# Jours de cotation par an selon le marché (crypto 24/7, forex 5j/7)
+TRADING_DAYS = {"crypto": 365, "forex": 260}
+
+_UNIT_SECONDS = {"m": 60, "h": 3600, "d": 86400, "wk": 604800, "w": 604800, "mo": 2629800}
+
+def periods_per_year(timeframe: str = "1d", market_type: str = "crypto") -> float:
+    """Nombre de barres par an pour un timeframe ("15m", "1h", "4h", "1d", "1wk", "1mo"...)"""
+    match = re.fullmatch(r'(\d*)\s*(mo|wk|m|h|d|w)', timeframe.strip().lower())
+    if not match:
+        raise ValueError(f"Timeframe non reconnu: {timeframe}")
+    count = int(match.group(1) or 1)
+    unit = match.group(2)
+    days = TRADING_DAYS.get(market_type, 365)
+    if unit in ("wk", "w"):
+        return 52.0 / count
+    if unit == "mo":
+        return 12.0 / count
+    return days * 86400.0 / (_UNIT_SECONDS[unit] * count)
+
+def compute_metrics(equity_curve, trades: List[Dict], initial_capital: float,
+                    timeframe: str = "1d", market_type: str = "crypto",
+                    rolling_window: Optional[int] = None) -> Dict:
+    """Calcule les métriques d'un backtest à partir de la courbe de capital et des trades.
+
+    Retourne le dictionnaire de résultats attendu par l'API (mêmes clés que run_backtest),
+    complété par les statistiques de risque étendues.
+    """
+    equity = np.asarray(equity_curve, dtype=float)
+    n = len(equity)
+    ppy = periods_per_year(timeframe, market_type)
+    final_capital = float(equity[-1]) if n else float(initial_capital)
+    total_return = (final_capital - initial_capital) / initial_capital * 100
+
+    # Rendements par barre, calculés une seule fois et réutilisés
+    returns = np.diff(equity) / equity[:-1] if n > 1 else np.empty(0)
+    mean_return = returns.mean() if len(returns) else 0.0
+    std_return = returns.std() if len(returns) else 0.0
+    sharpe_ratio = mean_return / std_return * np.sqrt(ppy) if std_return > 0 else 0.0
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2)) if len(returns) else 0.0
+    sortino_ratio = mean_return / downside * np.sqrt(ppy) if downside > 0 else 0.0
+
+    if n:
+        peak = np.maximum.accumulate(equity)
+        max_drawdown = abs(np.min((equity - peak) / peak)) * 100
+        # Durée max sous le plus haut: plus grand écart entre deux nouveaux sommets
+        at_peak = np.flatnonzero(equity >= peak)
+        max_drawdown_duration = int(np.max(np.diff(np.append(at_peak, n))) - 1)
+    else:
+        max_drawdown = 0.0
+        max_drawdown_duration = 0
+    years = len(returns) / ppy
+    if years > 0 and final_capital > 0:
+        cagr = (final_capital / initial_capital) ** (1 / years) - 1
+    else:
+        cagr = -1.0 if final_capital <= 0 else 0.0
+    calmar_ratio = cagr * 100 / max_drawdown if max_drawdown > 0 else 0.0
+
+    window = rolling_window or min(max(int(round(ppy / 12)), 2), max(len(returns), 2))
+    rolling_sharpe = _rolling_sharpe(returns, window, ppy)
+
+    pnl = np.fromiter((t['pnl'] for t in trades), dtype=float, count=len(trades))
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl < 0]
+    win_rate = len(wins) / len(pnl) * 100 if len(pnl) else 0
+    total_profit = wins.sum() if len(wins) else 0
+    total_loss = abs(losses.sum()) if len(losses) else 1
+    profit_factor = total_profit / total_loss if total_loss > 0 else 0
+
+    durations = _trade_durations(trades, ppy)
+    bars = max(n - 1, 1)
+    exposure = min(durations.sum() / bars * 100, 100.0) if len(durations) else 0.0
+
+    return {
+        "total_return": round(float(total_return), 2),
+        "sharpe_ratio": round(float(sharpe_ratio), 2),
+        "sortino_ratio": round(float(sortino_ratio), 2),
+        "calmar_ratio": round(float(calmar_ratio), 2),
+        "cagr": round(float(cagr) * 100, 2),
+        "max_drawdown": round(float(max_drawdown), 2),
+        "max_drawdown_duration": max_drawdown_duration,
+        "exposure": round(float(exposure), 2),
+        "win_rate": round(float(win_rate), 2),
+        "total_trades": len(trades),
+        "profit_factor": round(float(profit_factor), 2),
+        "avg_trade_duration": round(float(durations.mean()), 2) if len(durations) else 0.0,
+        "median_trade_duration": round(float(np.median(durations)), 2) if len(durations) else 0.0,
+        "max_trade_duration": round(float(durations.max()), 2) if len(durations) else 0.0,
+        "rolling_sharpe": np.round(rolling_sharpe, 2).tolist(),
+        "equity_curve": np.round(equity, 2).tolist(),
+        "trades": trades,
+        "final_capital": round(final_capital, 2)
+    }
+
+def _rolling_sharpe(returns: np.ndarray, window: int, ppy: float) -> np.ndarray:
+    """Sharpe annualisé glissant via sommes cumulées (une valeur par fenêtre complète)"""
+    if len(returns) < window:
+        return np.empty(0)
+    csum = np.concatenate(([0.0], np.cumsum(returns)))
+    csum_sq = np.concatenate(([0.0], np.cumsum(returns * returns)))
+    mean = (csum[window:] - csum[:-window]) / window
+    var = np.maximum((csum_sq[window:] - csum_sq[:-window]) / window - mean * mean, 0.0)
+    std = np.sqrt(var)
+    return np.divide(mean * np.sqrt(ppy), std, out=np.zeros_like(mean), where=std > 1e-12)
+
+def _trade_durations(trades: List[Dict], ppy: float) -> np.ndarray:
+    """Durée des trades en barres: 'duration_bars' si fourni, sinon déduite des dates"""
+    if not trades:
+        return np.empty(0)
+    if all('duration_bars' in t for t in trades):
+        return np.fromiter((t['duration_bars'] for t in trades), dtype=float, count=len(trades))
+    entry = pd.to_datetime([t['entry_date'] for t in trades], errors='coerce')
+    exit_ = pd.to_datetime([t['exit_date'] for t in trades], errors='coerce')
+    seconds = (exit_ - entry).total_seconds().to_numpy()
+    return seconds[~np.isnan(seconds)] / (365.25 * 86400.0 / ppy)
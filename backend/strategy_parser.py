@@ -12,7 +12,12 @@ class StrategyParser:
                 "rsi_oversold": 30,
                 "rsi_overbought": 70,
                 "stop_loss": 0.02,
-                "take_profit": 0.04
+                "take_profit": 0.04,
+                "fee_pct": 0.001,
+                "slippage_pct": 0.0005,
+                "spread_pct": 0.0,
+                "position_size": 1.0,
+                "intrabar_policy": "stop_first"
             }
         description_lower = description.lower()
         sma_short_match = re.search(r'sma\s*(\d+)\s*et\s*(\d+)|moving\s*average\s*(\d+)\s*(\d+)', description_lower)
@@ -54,4 +59,30 @@ class StrategyParser:
                 strategy["rsi_overbought"] = 70
         else:
             strategy["rsi_overbought"] = 70
+        fee_match = re.search(r'(?:frais|fees?|commission)\s*(\d+(?:\.\d+)?)%?', description_lower)
+        if fee_match:
+            strategy["fee_pct"] = float(fee_match.group(1)) / 100
+        else:
+            strategy["fee_pct"] = 0.001
+        slippage_match = re.search(r'slippage\s*(\d+(?:\.\d+)?)%?', description_lower)
+        if slippage_match:
+            strategy["slippage_pct"] = float(slippage_match.group(1)) / 100
+        else:
+            strategy["slippage_pct"] = 0.0005
+        spread_match = re.search(r'spread\s*(\d+(?:\.\d+)?)%?', description_lower)
+        if spread_match:
+            strategy["spread_pct"] = float(spread_match.group(1)) / 100
+        else:
+            strategy["spread_pct"] = 0.0
+        size_match = re.search(r'(?:taille|position\s*size)\s*(\d+(?:\.\d+)?)%', description_lower)
+        if size_match:
+            strategy["position_size"] = float(size_match.group(1)) / 100
+        else:
+            strategy["position_size"] = 1.0
+        if "target first" in description_lower or "objectif d'abord" in description_lower:
+            strategy["intrabar_policy"] = "target_first"
+        elif "nearest open" in description_lower:
+            strategy["intrabar_policy"] = "nearest_open"
+        else:
+            strategy["intrabar_policy"] = "stop_first"
         return strategy
@@ -8,6 +8,15 @@
   equity_curve: number[]
   trades: Trade[]
   optimization_suggestions: OptimizationSuggestion[]
+  sortino_ratio?: number
+  calmar_ratio?: number
+  cagr?: number
+  max_drawdown_duration?: number
+  exposure?: number
+  avg_trade_duration?: number
+  median_trade_duration?: number
+  max_trade_duration?: number
+  rolling_sharpe?: number[]
 }
 
 export interface Trade {